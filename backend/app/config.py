@@ -12,11 +12,34 @@ class Settings(BaseSettings):
     # ── Database ──────────────────────────────────────────────────────────
     # SQLite for the POC; swap to "postgresql+asyncpg://..." for production
     DATABASE_URL: str = "sqlite+aiosqlite:///./poc.db"
+    # Log every SQL statement (synchronous, very noisy — debugging only)
+    DATABASE_ECHO: bool = False
 
     # ── Kafka ─────────────────────────────────────────────────────────────
     KAFKA_BOOTSTRAP_SERVERS: str = "localhost:9092"
     KAFKA_TOPIC: str = "provision-requests"
 
+    # ── Sharding ──────────────────────────────────────────────────────────
+    # JSON list of shards (name, database_url, kafka_topic, cluster, weight);
+    # empty = one shard built from DATABASE_URL / KAFKA_TOPIC.  Must match
+    # the workers' SHARDS.  See app/sharding.py.
+    SHARDS: str = ""
+    SHARD_VIRTUAL_NODES: int = 128
+
+    # ── Logging ───────────────────────────────────────────────────────────
+    # LOG_FORMAT: "json" | "text".  LOG_SAMPLE_RATES keeps only a fraction
+    # of sub-WARNING records per logger, e.g. "app.routes.requests=0.1".
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLE_RATES: str = ""
+
+    # ── Tracing ───────────────────────────────────────────────────────────
+    # TRACING_EXPORTER: "none" | "file" (JSON lines) | "otlp" (HTTP collector)
+    TRACING_SERVICE_NAME: str = "provision-api"
+    TRACING_EXPORTER: str = "none"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+
     # ── Quota ─────────────────────────────────────────────────────────────
     MAX_GPU_QUOTA: int = 8
 
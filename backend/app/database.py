@@ -1,7 +1,12 @@
 """
-Async SQLAlchemy engine, session factory, and Base declarative class.
+Async SQLAlchemy engines, session factories, and Base declarative class.
+
+There is one engine per shard database (see app.sharding); shards that
+share a DATABASE_URL share an engine.  There is deliberately no default
+session: every query names its shard, or fans out to all of them.
 """
 
+import asyncio
 import logging
 
 from sqlalchemy.exc import OperationalError
@@ -9,34 +14,69 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, Asyn
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
+from app.sharding import HashRing, Shard, parse_shards
 
 logger = logging.getLogger(__name__)
 
-# Create the async engine — echo=True for development visibility
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
-
-# Session factory used as a FastAPI dependency
-async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# Route users to shards — must be configured identically in the workers
+shard_ring = HashRing(
+    parse_shards(settings.SHARDS, settings.DATABASE_URL, settings.KAFKA_TOPIC),
+    virtual_nodes=settings.SHARD_VIRTUAL_NODES,
+)
 
+# Create one async engine per distinct database — set DATABASE_ECHO=true to
+# log every statement
+_engines = {
+    url: create_async_engine(url, echo=settings.DATABASE_ECHO)
+    for url in dict.fromkeys(shard.database_url for shard in shard_ring.shards)
+}
+_session_factories = {
+    url: async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    for url, engine in _engines.items()
+}
 
 class Base(DeclarativeBase):
     """Shared declarative base for all ORM models."""
     pass
 
 
+def shard_session(shard: Shard) -> AsyncSession:
+    """Open a session on ``shard``'s database (use as ``async with``)."""
+    return _session_factories[shard.database_url]()
+
+
+def shard_databases() -> list[tuple[list[Shard], async_sessionmaker]]:
+    """Each distinct shard database with the shard(s) stored in it."""
+    return [
+        ([shard for shard in shard_ring.shards if shard.database_url == url], factory)
+        for url, factory in _session_factories.items()
+    ]
+
+
+async def execute_on_all_shards(statement) -> list[tuple]:
+    """Run a read-only ``statement`` on every shard concurrently; concatenate the rows."""
+
+    async def _run(factory: async_sessionmaker) -> list[tuple]:
+        async with factory() as session:
+            return (await session.execute(statement)).tuples().all()
+
+    results = await asyncio.gather(*(_run(f) for f in _session_factories.values()))
+    return [row for rows in results for row in rows]
+
+
 async def init_db() -> None:
-    """Create all tables.  Tolerates concurrent attempts by multiple workers."""
-    try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-    except OperationalError as exc:
-        if "already exists" in str(exc):
-            logger.info("Tables already exist — skipping creation.")
-        else:
-            raise
-
-
-async def get_db() -> AsyncSession:  # type: ignore[misc]
-    """FastAPI dependency that yields an async DB session."""
-    async with async_session() as session:
-        yield session
+    """Create all tables on every shard.  Tolerates concurrent attempts by multiple workers."""
+    for db_engine in _engines.values():
+        try:
+            async with db_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        except OperationalError as exc:
+            if "already exists" in str(exc):
+                logger.info("Tables already exist — skipping creation.")
+            else:
+                raise
+
+
+async def dispose_engines() -> None:
+    for db_engine in _engines.values():
+        await db_engine.dispose()
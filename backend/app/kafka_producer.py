@@ -11,8 +11,10 @@ import logging
 from aiokafka import AIOKafkaProducer
 
 from app.config import settings
+from app.tracing import get_tracer, inject_kafka_headers
 
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
 
 
 class KafkaProducerService:
@@ -52,8 +54,15 @@ class KafkaProducerService:
         user_id: str,
         gpu_count: int,
         duration_hours: int,
-    ) -> None:
-        """Publish a provision-request event to Kafka."""
+        topic: str | None = None,
+    ) -> bool:
+        """Publish a provision-request event to Kafka.
+
+        ``topic`` is the user's shard topic (defaults to KAFKA_TOPIC).  Events
+        are keyed by ``user_id`` so each user's events share a partition.
+        Returns False if the event was skipped because Kafka is unavailable.
+        """
+        topic = topic or settings.KAFKA_TOPIC
         message = {
             "request_id": request_id,
             "user_id": user_id,
@@ -62,11 +71,30 @@ class KafkaProducerService:
         }
 
         if self._producer is None:
-            logger.warning("Kafka producer is not available — skipping event: %s", message)
-            return
+            logger.warning(
+                "Kafka producer is not available — skipping event for request %s",
+                request_id,
+                extra={"request_id": request_id, "topic": topic},
+            )
+            return False
 
-        await self._producer.send_and_wait(settings.KAFKA_TOPIC, value=message)
-        logger.info("Published provision event to '%s': %s", settings.KAFKA_TOPIC, message)
+        with tracer.start_as_current_span("kafka.publish") as span:
+            span.set_attribute("messaging.destination.name", topic)
+            span.set_attribute("provision.request_id", request_id)
+            # Inject inside the span so the worker's spans hang off the publish
+            await self._producer.send_and_wait(
+                topic,
+                value=message,
+                key=user_id.encode("utf-8"),
+                headers=inject_kafka_headers(),
+            )
+        logger.info(
+            "Published provision event for request %s to '%s'",
+            request_id,
+            topic,
+            extra={"request_id": request_id, "topic": topic},
+        )
+        return True
 
 
 # Module-level singleton used across the app
@@ -0,0 +1,181 @@
+"""
+Structured, non-blocking logging shared by the API and the worker.
+
+Records are handed to a ``QueueHandler`` on the event-loop thread and
+formatted/written by a ``QueueListener`` background thread, so a slow
+stdout never stalls the loop.  uvicorn's own loggers are routed the same
+way instead of through the handlers it installs.  Per-logger sampling drops a fraction of
+high-volume DEBUG/INFO records; WARNING and above are always kept.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from opentelemetry import trace
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+# (uvicorn's ANSI-coloured duplicate of the message is dropped too)
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "trace_id",
+    "span_id",
+    "color_message",
+}
+
+# Loggers that ship their own (blocking) handlers with propagate=False
+_SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: QueueListener | None = None
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    """Parse ``"app.routes.requests=0.1,__main__=0.5"`` into a rate per logger."""
+    rates: dict[str, float] = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, rate = item.split("=", 1)
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only ``rate`` of the sub-WARNING records from the configured loggers.
+
+    A rate applies to the named logger and its children; the most specific
+    match wins.  Unlisted loggers are not sampled.
+    """
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self._cache: dict[str, float] = {}
+
+    def _rate_for(self, name: str) -> float:
+        if name not in self._cache:
+            rate = 1.0
+            best = -1
+            for prefix, value in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > best:
+                    rate, best = value, len(prefix)
+            self._cache[name] = rate
+        return self._cache[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class TraceContextFilter(logging.Filter):
+    """Stamp the active trace/span id while still on the emitting thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        ctx = trace.get_current_span().get_span_context()
+        if ctx.is_valid:
+            record.trace_id = format(ctx.trace_id, "032x")
+            record.span_id = format(ctx.span_id, "016x")
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra=`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in ("trace_id", "span_id"):
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        elif record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _StructuredQueueHandler(QueueHandler):
+    """QueueHandler that keeps ``extra`` fields instead of pre-formatting them away."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "json",
+    sample_rates: dict[str, float] | None = None,
+) -> None:
+    """Route the root logger through a background-thread writer.
+
+    ``fmt`` is ``"json"`` for structured output or ``"text"`` for the
+    classic ``asctime - name - level - message`` lines.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    stream = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _StructuredQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rates or {}))
+    handler.addFilter(TraceContextFilter())
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    # Runs after uvicorn's own logging config (the app is imported later),
+    # so its access log goes through the queue and sampling too
+    for name in _SERVER_LOGGERS:
+        server_logger = logging.getLogger(name)
+        for existing in server_logger.handlers[:]:
+            server_logger.removeHandler(existing)
+        server_logger.propagate = True
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
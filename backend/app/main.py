@@ -2,8 +2,8 @@
 FastAPI application entrypoint for the NVIDIA Self-Service Portal API.
 
 Lifespan:
-  - startup: create DB tables, start Kafka producer
-  - shutdown: stop Kafka producer
+  - startup: configure tracing, create DB tables, start Kafka producer
+  - shutdown: stop Kafka producer, flush spans
 """
 
 from __future__ import annotations
@@ -15,11 +15,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.database import init_db
+from app.database import dispose_engines, init_db
 from app.kafka_producer import kafka_service
+from app.logging_setup import configure_logging, parse_sample_rates
+from app.tracing import configure_tracing, shutdown_tracing
+from app.routes.admin import router as admin_router
 from app.routes.requests import router as requests_router
 
-logging.basicConfig(level=logging.INFO)
+configure_logging(
+    level=settings.LOG_LEVEL,
+    fmt=settings.LOG_FORMAT,
+    sample_rates=parse_sample_rates(settings.LOG_SAMPLE_RATES),
+)
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +34,13 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Startup / shutdown lifecycle."""
     # ── Startup ───────────────────────────────────────────────────────────
+    configure_tracing(
+        settings.TRACING_SERVICE_NAME,
+        exporter=settings.TRACING_EXPORTER,
+        file_path=settings.TRACING_FILE_PATH,
+        otlp_endpoint=settings.TRACING_OTLP_ENDPOINT,
+    )
+
     logger.info("Initializing database …")
     await init_db()
 
@@ -38,6 +52,8 @@ async def lifespan(app: FastAPI):
     # ── Shutdown ──────────────────────────────────────────────────────────
     logger.info("Stopping Kafka producer …")
     await kafka_service.stop()
+    await dispose_engines()
+    shutdown_tracing()
 
 
 app = FastAPI(
@@ -58,6 +74,7 @@ app.add_middleware(
 
 # ── Routers ───────────────────────────────────────────────────────────────
 app.include_router(requests_router, prefix="/api/v1")
+app.include_router(admin_router, prefix="/api/v1")
 
 
 @app.get("/health", tags=["health"])
@@ -1,5 +1,5 @@
 """
-SQLAlchemy ORM model for the provision_requests table.
+SQLAlchemy ORM models for the provision_requests and dead_letters tables.
 Maps directly to the schema defined in .context/database_schema.md.
 """
 
@@ -30,6 +30,11 @@ class ProvisionRequest(Base):
     )
     kubeconfig: Mapped[str | None] = mapped_column(Text, nullable=True)
     error_msg: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Set while a worker holds the request in 'provisioning'; once it lapses
+    # the row is considered orphaned and may be reclaimed by another worker.
+    leased_until: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=_utcnow
     )
@@ -39,3 +44,26 @@ class ProvisionRequest(Base):
 
     def __repr__(self) -> str:
         return f"<ProvisionRequest id={self.id} status={self.status}>"
+
+
+class DeadLetter(Base):
+    """A provision event that exhausted its retry budget in the worker."""
+
+    __tablename__ = "dead_letters"
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    request_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)  # original event JSON
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    error_msg: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=_utcnow
+    )
+    replayed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<DeadLetter id={self.id} request_id={self.request_id}>"
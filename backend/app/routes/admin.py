@@ -0,0 +1,173 @@
+"""
+Admin routes for the worker's dead-letter queue.
+  GET  /admin/dead-letters         — inspect exhausted provision events
+  POST /admin/dead-letters/replay  — re-publish them (bulk) to the main topic
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timezone
+
+from fastapi import APIRouter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import execute_on_all_shards, shard_databases, shard_ring
+from app.kafka_producer import kafka_service
+from app.models import DeadLetter, ProvisionRequest
+from app.schemas import (
+    DeadLetterResponse,
+    ReplayDeadLettersResponse,
+    ReplayDeadLettersSchema,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+# ── GET /api/v1/admin/dead-letters ───────────────────────────────────────
+
+@router.get(
+    "/dead-letters",
+    response_model=list[DeadLetterResponse],
+    summary="List dead-lettered provision events",
+)
+async def list_dead_letters(
+    include_replayed: bool = False,
+    limit: int = 100,
+) -> list[DeadLetterResponse]:
+    query = select(DeadLetter).order_by(DeadLetter.created_at.desc()).limit(limit)
+    if not include_replayed:
+        query = query.where(DeadLetter.replayed_at.is_(None))
+
+    letters = [row for (row,) in await execute_on_all_shards(query)]
+    letters.sort(key=lambda row: row.created_at, reverse=True)
+
+    return [
+        DeadLetterResponse(
+            id=row.id,
+            request_id=row.request_id,
+            attempts=row.attempts,
+            error_msg=row.error_msg,
+            payload=json.loads(row.payload),
+            created_at=row.created_at,
+            replayed_at=row.replayed_at,
+        )
+        for row in letters[:limit]
+    ]
+
+
+# ── POST /api/v1/admin/dead-letters/replay ───────────────────────────────
+
+@router.post(
+    "/dead-letters/replay",
+    response_model=ReplayDeadLettersResponse,
+    summary="Replay dead-lettered provision events",
+)
+async def replay_dead_letters(
+    body: ReplayDeadLettersSchema,
+) -> ReplayDeadLettersResponse:
+    """Reset each request to ``pending`` and re-publish it with a fresh attempt budget.
+
+    Dead letters live next to their request on its shard, so each shard
+    database is replayed in turn, and each request is re-published to the
+    topic of the shard whose database holds it — after a reshard that is
+    not necessarily the shard its user now hashes to.
+
+    Requests are handled one at a time: a dead letter is marked replayed
+    only once its event is published.  A request whose publish fails (or
+    is skipped because Kafka is down) gets its old status back, keeps its
+    dead letter replayable, and is reported under ``failed``.
+    """
+    query = select(DeadLetter).where(DeadLetter.replayed_at.is_(None))
+    if body.ids is not None:
+        query = query.where(DeadLetter.id.in_(body.ids))
+
+    replayed: list[str] = []
+    failed: list[str] = []
+    for db_shards, session_factory in shard_databases():
+        async with session_factory() as db:
+            letters = (await db.execute(query)).scalars().all()
+            if not letters:
+                continue
+            letters_by_request: dict[str, list[DeadLetter]] = {}
+            for letter in letters:
+                letters_by_request.setdefault(letter.request_id, []).append(letter)
+
+            requests = (
+                await db.execute(
+                    select(ProvisionRequest).where(
+                        ProvisionRequest.id.in_(list(letters_by_request))
+                    )
+                )
+            ).scalars().all()
+
+            for request in requests:
+                if await _replay_request(db, request, _home_topic(request, db_shards)):
+                    now = datetime.now(timezone.utc)
+                    for letter in letters_by_request[request.id]:
+                        letter.replayed_at = now
+                    await db.commit()
+                    replayed.append(request.id)
+                else:
+                    failed.append(request.id)
+
+    logger.info(
+        "Replayed %d dead-lettered request(s), %d failed", len(replayed), len(failed)
+    )
+    return ReplayDeadLettersResponse(replayed=replayed, failed=failed)
+
+
+async def _replay_request(db: AsyncSession, request: ProvisionRequest, topic: str) -> bool:
+    """Reset ``request`` to pending and publish it; undo the reset on failure."""
+    previous_status, previous_error = request.status, request.error_msg
+
+    # Pending must be committed first, or the worker could not claim it
+    request.status = "pending"
+    request.error_msg = None
+    await db.commit()
+
+    try:
+        published = await kafka_service.send_provision_event(
+            request_id=request.id,
+            user_id=request.user_id,
+            gpu_count=request.gpu_count,
+            duration_hours=request.duration_hours,
+            topic=topic,
+        )
+    except Exception as exc:
+        logger.error(
+            "Failed to replay request %s: %s",
+            request.id,
+            exc,
+            extra={"request_id": request.id, "topic": topic},
+        )
+        published = False
+
+    if not published:
+        # Only if nobody picked it up in the meantime (e.g. a polling worker)
+        await db.execute(
+            update(ProvisionRequest)
+            .where(ProvisionRequest.id == request.id)
+            .where(ProvisionRequest.status == "pending")
+            .values(status=previous_status, error_msg=previous_error)
+        )
+        await db.commit()
+    return published
+
+
+def _home_topic(request: ProvisionRequest, db_shards: list) -> str:
+    """Topic of the shard whose database stores ``request``.
+
+    When several shards share one database, prefer the shard tagged in the
+    request id, then the user's current shard, then the first one.
+    """
+    for candidate in (
+        shard_ring.shard_for_request_id(request.id),
+        shard_ring.shard_for(request.user_id),
+    ):
+        if candidate in db_shards:
+            return candidate.kafka_topic
+    return db_shards[0].kafka_topic
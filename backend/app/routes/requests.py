@@ -8,22 +8,31 @@ Routes for GPU provisioning requests.
 from __future__ import annotations
 
 import logging
+from operator import itemgetter
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
+from app.database import execute_on_all_shards, shard_ring, shard_session
 from app.kafka_producer import kafka_service
 from app.models import ProvisionRequest
+from app.sharding import new_request_id
+from app.tracing import get_tracer
 from app.schemas import (
     CreateRequestResponse,
     CreateRequestSchema,
     RequestStatusResponse,
 )
+from app.serializers import (
+    CREATED_AT_INDEX,
+    STATUS_COLUMNS,
+    encode_status_row,
+    encode_status_rows,
+)
 
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
 router = APIRouter(prefix="/requests", tags=["requests"])
 
 
@@ -34,31 +43,26 @@ router = APIRouter(prefix="/requests", tags=["requests"])
     response_model=list[RequestStatusResponse],
     summary="Get all provisioning requests (history)",
 )
-async def get_all_requests(
-    db: AsyncSession = Depends(get_db),
-    limit: int = 100,
-) -> list[RequestStatusResponse]:
-    """Return all requests ordered by most recent first."""
-    result = await db.execute(
-        select(ProvisionRequest)
+async def get_all_requests(limit: int = 100) -> Response:
+    """Return all requests ordered by most recent first.
+
+    Each shard returns its own newest ``limit`` rows; they are merged here.
+    Rows are fetched as plain tuples and encoded directly (see
+    ``app.serializers``); ``response_model`` only documents the shape.
+    """
+    rows = await execute_on_all_shards(
+        select(*STATUS_COLUMNS)
         .order_by(ProvisionRequest.created_at.desc())
         .limit(limit)
     )
-    rows = result.scalars().all()
-
-    return [
-        RequestStatusResponse(
-            request_id=row.id,
-            status=row.status,
-            user_id=row.user_id,
-            gpu_count=row.gpu_count,
-            duration_hours=row.duration_hours,
-            kubeconfig=row.kubeconfig,
-            created_at=row.created_at,
-            completed_at=row.updated_at if row.status == "completed" else None,
-        )
-        for row in rows
-    ]
+    if len(shard_ring.shards) > 1:
+        rows.sort(key=itemgetter(CREATED_AT_INDEX), reverse=True)
+        rows = rows[:limit]
+
+    return Response(
+        content=encode_status_rows(rows),
+        media_type="application/json",
+    )
 
 
 # ── POST /api/v1/requests ────────────────────────────────────────────────
@@ -69,37 +73,50 @@ async def get_all_requests(
     status_code=status.HTTP_201_CREATED,
     summary="Submit a new GPU provisioning request",
 )
-async def create_request(
-    body: CreateRequestSchema,
-    db: AsyncSession = Depends(get_db),
-) -> CreateRequestResponse:
-    # 1. Quota check (mock: max 8 GPUs per single request)
-    if body.gpu_count > settings.MAX_GPU_QUOTA:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"GPU count exceeds max quota of {settings.MAX_GPU_QUOTA}",
+async def create_request(body: CreateRequestSchema) -> CreateRequestResponse:
+    with tracer.start_as_current_span("POST /api/v1/requests") as span:
+        shard = shard_ring.shard_for(body.user_id)
+        span.set_attribute("provision.user_id", body.user_id)
+        span.set_attribute("provision.gpu_count", body.gpu_count)
+        span.set_attribute("provision.shard", shard.name)
+
+        # 1. Quota check (mock: max 8 GPUs per single request)
+        if body.gpu_count > settings.MAX_GPU_QUOTA:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"GPU count exceeds max quota of {settings.MAX_GPU_QUOTA}",
+            )
+
+        # 2. Persist to the user's shard
+        new_request = ProvisionRequest(
+            id=new_request_id(shard),
+            user_id=body.user_id,
+            gpu_count=body.gpu_count,
+            duration_hours=body.duration_hours,
+            status="pending",
+        )
+        with tracer.start_as_current_span("db.commit"):
+            async with shard_session(shard) as db:
+                db.add(new_request)
+                await db.commit()
+                await db.refresh(new_request)
+
+        span.set_attribute("provision.request_id", new_request.id)
+        logger.info(
+            "Created provision request %s for user %s",
+            new_request.id,
+            body.user_id,
+            extra={"request_id": new_request.id, "user_id": body.user_id},
         )
 
-    # 2. Persist to DB
-    new_request = ProvisionRequest(
-        user_id=body.user_id,
-        gpu_count=body.gpu_count,
-        duration_hours=body.duration_hours,
-        status="pending",
-    )
-    db.add(new_request)
-    await db.commit()
-    await db.refresh(new_request)
-
-    logger.info("Created provision request %s for user %s", new_request.id, body.user_id)
-
-    # 3. Publish event to Kafka
-    await kafka_service.send_provision_event(
-        request_id=new_request.id,
-        user_id=body.user_id,
-        gpu_count=body.gpu_count,
-        duration_hours=body.duration_hours,
-    )
+        # 3. Publish event to the shard's Kafka topic
+        await kafka_service.send_provision_event(
+            request_id=new_request.id,
+            user_id=body.user_id,
+            gpu_count=body.gpu_count,
+            duration_hours=body.duration_hours,
+            topic=shard.kafka_topic,
+        )
 
     return CreateRequestResponse(
         request_id=new_request.id,
@@ -114,14 +131,17 @@ async def create_request(
     response_model=RequestStatusResponse,
     summary="Get the status of a provisioning request",
 )
-async def get_request_status(
-    request_id: str,
-    db: AsyncSession = Depends(get_db),
-) -> RequestStatusResponse:
-    result = await db.execute(
-        select(ProvisionRequest).where(ProvisionRequest.id == request_id)
-    )
-    row = result.scalar_one_or_none()
+async def get_request_status(request_id: str) -> Response:
+    query = select(*STATUS_COLUMNS).where(ProvisionRequest.id == request_id)
+
+    # The id names its shard; only ids minted before sharding need a fan-out
+    shard = shard_ring.shard_for_request_id(request_id)
+    if shard is not None:
+        async with shard_session(shard) as db:
+            row = (await db.execute(query)).tuples().one_or_none()
+    else:
+        rows = await execute_on_all_shards(query)
+        row = rows[0] if rows else None
 
     if row is None:
         raise HTTPException(
@@ -129,13 +149,4 @@ async def get_request_status(
             detail=f"Request {request_id} not found",
         )
 
-    return RequestStatusResponse(
-        request_id=row.id,
-        status=row.status,
-        user_id=row.user_id,
-        gpu_count=row.gpu_count,
-        duration_hours=row.duration_hours,
-        kubeconfig=row.kubeconfig,
-        created_at=row.created_at,
-        completed_at=row.updated_at if row.status == "completed" else None,
-    )
+    return Response(content=encode_status_row(row), media_type="application/json")
@@ -39,3 +39,27 @@ class RequestStatusResponse(BaseModel):
     completed_at: datetime | None = None
 
     model_config = {"from_attributes": True}
+
+
+# ── Response for GET /api/v1/admin/dead-letters ───────────────────────────
+
+class DeadLetterResponse(BaseModel):
+    id: str
+    request_id: str
+    attempts: int
+    error_msg: str | None = None
+    payload: dict
+    created_at: datetime
+    replayed_at: datetime | None = None
+
+
+# ── Request body / response for POST /api/v1/admin/dead-letters/replay ───
+
+class ReplayDeadLettersSchema(BaseModel):
+    # Omit (or null) to replay every dead letter that has not been replayed yet
+    ids: list[str] | None = None
+
+
+class ReplayDeadLettersResponse(BaseModel):
+    replayed: list[str]  # request_ids re-published to the main topic
+    failed: list[str] = []  # request_ids that could not be published (left as they were)
@@ -0,0 +1,66 @@
+"""
+Fast JSON encoding for request-status rows.
+
+The list and status endpoints select only the columns below and encode the
+resulting tuples straight to bytes with orjson, skipping the Pydantic model
+construction and FastAPI's second ``response_model`` validation pass.  The
+output matches ``RequestStatusResponse`` field for field.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+import orjson
+
+from app.models import ProvisionRequest
+
+# Column order is the tuple layout consumed by `status_row_to_dict`
+STATUS_COLUMNS = (
+    ProvisionRequest.id,
+    ProvisionRequest.status,
+    ProvisionRequest.user_id,
+    ProvisionRequest.gpu_count,
+    ProvisionRequest.duration_hours,
+    ProvisionRequest.kubeconfig,
+    ProvisionRequest.created_at,
+    ProvisionRequest.updated_at,
+)
+
+# Position of created_at in a STATUS_COLUMNS row, for merging shard results
+CREATED_AT_INDEX = STATUS_COLUMNS.index(ProvisionRequest.created_at)
+
+# OPT_UTC_Z renders UTC offsets as "Z", the same as Pydantic
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def status_row_to_dict(row: Sequence) -> dict:
+    """Map a ``STATUS_COLUMNS`` tuple to the ``RequestStatusResponse`` shape."""
+    (
+        request_id,
+        status,
+        user_id,
+        gpu_count,
+        duration_hours,
+        kubeconfig,
+        created_at,
+        updated_at,
+    ) = row
+    return {
+        "request_id": request_id,
+        "status": status,
+        "user_id": user_id,
+        "gpu_count": gpu_count,
+        "duration_hours": duration_hours,
+        "kubeconfig": kubeconfig,
+        "created_at": created_at,
+        "completed_at": updated_at if status == "completed" else None,
+    }
+
+
+def encode_status_row(row: Sequence) -> bytes:
+    return orjson.dumps(status_row_to_dict(row), option=_ORJSON_OPTIONS)
+
+
+def encode_status_rows(rows: Iterable[Sequence]) -> bytes:
+    return orjson.dumps([status_row_to_dict(row) for row in rows], option=_ORJSON_OPTIONS)
@@ -0,0 +1,102 @@
+"""
+User → shard routing with consistent hashing.
+
+A shard is one database + one Kafka topic + one GPU cluster, served by its
+own pool of workers.  Users are placed on a hash ring with many virtual
+nodes per shard, so adding or removing a shard only moves ~1/N of users.
+
+Shards are configured with the ``SHARDS`` setting, a JSON list such as:
+
+    [{"name": "us-east", "database_url": "postgresql+asyncpg://...",
+      "kafka_topic": "provision-requests-us-east", "cluster": "gpu-us-east"}]
+
+When ``SHARDS`` is empty a single shard is built from ``DATABASE_URL`` /
+``KAFKA_TOPIC``, which behaves exactly like the unsharded setup.
+
+Request ids carry their shard: the last 8 hex digits of the UUID are a
+CRC32 tag of the shard *name*, so a status poll goes straight to one
+database and the mapping survives adding shards.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import uuid
+import zlib
+from dataclasses import dataclass
+
+DEFAULT_CLUSTER = "nvidia-gpu-cluster"
+
+
+@dataclass(frozen=True)
+class Shard:
+    name: str
+    database_url: str
+    kafka_topic: str
+    cluster: str = DEFAULT_CLUSTER
+    weight: int = 1  # relative share of the ring
+
+
+def _hash(key: str) -> int:
+    # Stable across processes (unlike hash()), so API and workers agree
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+def shard_tag(name: str) -> str:
+    """8-hex-digit tag identifying a shard inside request ids."""
+    return format(zlib.crc32(name.encode("utf-8")), "08x")
+
+
+def new_request_id(shard: Shard) -> str:
+    """A UUID-shaped request id whose last 8 hex digits name ``shard``."""
+    return str(uuid.uuid4())[:-8] + shard_tag(shard.name)
+
+
+class HashRing:
+    """Consistent-hash ring mapping arbitrary keys to shards."""
+
+    def __init__(self, shards: list[Shard], virtual_nodes: int = 128) -> None:
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self.shards = shards
+        points = []
+        for shard in shards:
+            for i in range(virtual_nodes * max(shard.weight, 1)):
+                points.append((_hash(f"{shard.name}#{i}"), shard))
+        points.sort(key=lambda point: point[0])
+        self._keys = [key for key, _ in points]
+        self._shards = [shard for _, shard in points]
+
+        self._by_tag = {shard_tag(shard.name): shard for shard in shards}
+        if len(self._by_tag) != len(shards):
+            raise ValueError("Shard names collide on their request-id tag; rename one")
+
+    def shard_for(self, key: str) -> Shard:
+        """The first virtual node clockwise from ``key``'s hash."""
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._shards[index]
+
+    def shard_for_request_id(self, request_id: str) -> Shard | None:
+        """The shard tagged in ``request_id``, or None for untagged (legacy) ids."""
+        return self._by_tag.get(request_id[-8:])
+
+
+def parse_shards(raw: str, database_url: str, kafka_topic: str) -> list[Shard]:
+    """Parse the ``SHARDS`` setting, falling back to a single default shard."""
+    if not raw.strip():
+        return [Shard(name="default", database_url=database_url, kafka_topic=kafka_topic)]
+
+    shards = [Shard(**entry) for entry in json.loads(raw)]
+    names = [shard.name for shard in shards]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate shard names in SHARDS: {names}")
+    return shards
+
+
+def get_shard(shards: list[Shard], name: str) -> Shard:
+    for shard in shards:
+        if shard.name == name:
+            return shard
+    raise ValueError(f"Unknown shard {name!r}; configured: {[s.name for s in shards]}")
@@ -0,0 +1,92 @@
+"""
+OpenTelemetry tracing setup shared by the API and the worker.
+
+The API starts a trace per request and injects its context into the Kafka
+message headers; the worker extracts it so every state transition lands in
+the same trace.  Spans are exported either as JSON lines to a local file or
+over OTLP/HTTP to a collector.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+logger = logging.getLogger(__name__)
+
+_provider: TracerProvider | None = None
+_span_file = None
+
+
+def configure_tracing(
+    service_name: str,
+    exporter: str = "none",
+    file_path: str = "traces.jsonl",
+    otlp_endpoint: str = "http://localhost:4318/v1/traces",
+) -> None:
+    """Install a global tracer provider.
+
+    ``exporter`` is one of:
+      - ``"none"``: spans are created (and propagated) but not exported
+      - ``"file"``: one JSON span per line appended to ``file_path``
+      - ``"otlp"``: OTLP/HTTP to ``otlp_endpoint`` (e.g. a local collector)
+    """
+    global _provider, _span_file
+
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: service_name}))
+
+    if exporter == "file":
+        _span_file = open(file_path, "a", encoding="utf-8")
+        span_exporter = ConsoleSpanExporter(
+            out=_span_file,
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+        provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    elif exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        provider.add_span_processor(
+            BatchSpanProcessor(OTLPSpanExporter(endpoint=otlp_endpoint))
+        )
+    elif exporter != "none":
+        raise ValueError(f"Unknown tracing exporter: {exporter!r}")
+
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    logger.info("Tracing configured for %s (exporter=%s)", service_name, exporter)
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and release the exporter."""
+    global _provider, _span_file
+
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+    if _span_file is not None:
+        _span_file.close()
+        _span_file = None
+
+
+def get_tracer(name: str) -> trace.Tracer:
+    return trace.get_tracer(name)
+
+
+def inject_kafka_headers() -> list[tuple[str, bytes]]:
+    """Serialize the current trace context into Kafka record headers."""
+    carrier: dict[str, str] = {}
+    propagate.inject(carrier)
+    return [(key, value.encode("utf-8")) for key, value in carrier.items()]
+
+
+def extract_kafka_context(
+    headers: Iterable[tuple[str, bytes]] | None,
+) -> context.Context:
+    """Rebuild a trace context from Kafka record headers (empty if absent)."""
+    carrier = {key: value.decode("utf-8") for key, value in headers or ()}
+    return propagate.extract(carrier)
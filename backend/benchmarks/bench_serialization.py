@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: request-status serialization, before vs. after.
+
+  before: ORM row → RequestStatusResponse → FastAPI response_model
+          re-validation → json.dumps (what GET /api/v1/requests used to do)
+  after:  column tuple → orjson (app.serializers)
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py [--rows 100] [--iterations 2000]
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pydantic import TypeAdapter
+
+from app.schemas import RequestStatusResponse
+from app.serializers import encode_status_rows
+
+KUBECONFIG = "apiVersion: v1\nkind: Config\n" + "# padding\n" * 40
+
+
+def make_rows(count: int) -> list[tuple]:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(count):
+        status = ("pending", "provisioning", "completed", "failed")[i % 4]
+        rows.append(
+            (
+                str(uuid.uuid4()),
+                status,
+                f"user-{i % 17}",
+                1 + i % 8,
+                1 + i % 24,
+                KUBECONFIG if status == "completed" else None,
+                now - timedelta(minutes=i),
+                now - timedelta(minutes=i) + timedelta(seconds=5),
+            )
+        )
+    return rows
+
+
+def as_orm_objects(rows: list[tuple]) -> list[SimpleNamespace]:
+    fields = ("id", "status", "user_id", "gpu_count", "duration_hours",
+              "kubeconfig", "created_at", "updated_at")
+    return [SimpleNamespace(**dict(zip(fields, row))) for row in rows]
+
+
+_adapter = TypeAdapter(list[RequestStatusResponse])
+
+
+def before(objects: list[SimpleNamespace]) -> bytes:
+    models = [
+        RequestStatusResponse(
+            request_id=row.id,
+            status=row.status,
+            user_id=row.user_id,
+            gpu_count=row.gpu_count,
+            duration_hours=row.duration_hours,
+            kubeconfig=row.kubeconfig,
+            created_at=row.created_at,
+            completed_at=row.updated_at if row.status == "completed" else None,
+        )
+        for row in objects
+    ]
+    # FastAPI dumps returned models, re-validates against response_model,
+    # then renders with jsonable_encoder + json.dumps
+    validated = _adapter.validate_python([m.model_dump() for m in models])
+    return json.dumps(_adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def after(rows: list[tuple]) -> bytes:
+    return encode_status_rows(rows)
+
+
+def bench(label: str, fn, arg, rows: int, iterations: int) -> float:
+    fn(arg)  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    elapsed = time.perf_counter() - start
+    rate = rows * iterations / elapsed
+    print(f"{label:<8} {elapsed / iterations * 1e3:8.3f} ms/response  {rate:12,.0f} rows/sec")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    objects = as_orm_objects(rows)
+
+    # Both paths must produce the same document
+    assert json.loads(before(objects)) == json.loads(after(rows))
+
+    print(f"{args.rows} rows x {args.iterations} iterations")
+    old = bench("before", before, objects, args.rows, args.iterations)
+    new = bench("after", after, rows, args.rows, args.iterations)
+    print(f"speedup  {new / old:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
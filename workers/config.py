@@ -3,6 +3,7 @@ Worker configuration via pydantic-settings.
 All values have sensible POC defaults and can be overridden with env vars.
 """
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -17,8 +18,76 @@ class WorkerSettings(BaseSettings):
     KAFKA_TOPIC: str = "provision-requests"
     KAFKA_GROUP_ID: str = "provision-worker-group"
 
+    # ── Sharding ──────────────────────────────────────────────────────────
+    # Same SHARDS JSON as the backend (see backend/app/sharding.py).  Each
+    # worker process serves one shard: WORKER_SHARD picks it by name (empty
+    # = the first shard), overriding DATABASE_URL, KAFKA_TOPIC and
+    # PROVISION_CLUSTER and suffixing the group ids / retry / DLQ topics.
+    SHARDS: str = ""
+    WORKER_SHARD: str = ""
+    PROVISION_CLUSTER: str = "nvidia-gpu-cluster"
+
+    # ── Logging ───────────────────────────────────────────────────────────
+    # LOG_FORMAT: "json" | "text".  LOG_SAMPLE_RATES keeps only a fraction
+    # of sub-WARNING records per logger, e.g. "__main__=0.1".
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLE_RATES: str = ""
+
+    # ── Tracing ───────────────────────────────────────────────────────────
+    # TRACING_EXPORTER: "none" | "file" (JSON lines) | "otlp" (HTTP collector)
+    TRACING_SERVICE_NAME: str = "provision-worker"
+    TRACING_EXPORTER: str = "none"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+
     # ── Worker Behavior ───────────────────────────────────────────────────
-    MOCK_PROVISION_DELAY_SECONDS: int = 5
+    # Messages provisioned concurrently by one worker process
+    MAX_CONCURRENT_PROVISIONS: int = 4
+    # On shutdown, how long to wait for in-flight provisions before
+    # cancelling and requeueing them
+    DRAIN_TIMEOUT_SECONDS: float = 30.0
+    # How long a 'provisioning' row is owned by its worker; must exceed
+    # PROVISIONER_TIMEOUT_SECONDS.  Expired leases are reclaimed on startup.
+    PROVISION_LEASE_SECONDS: float = 120.0
+
+    # ── Provisioner ───────────────────────────────────────────────────────
+    # PROVISIONER_DRIVER: "mock" (the only driver so far; see provisioners.py)
+    PROVISIONER_DRIVER: str = "mock"
+    PROVISIONER_POOL_SIZE: int = 4
+    PROVISIONER_RATE_LIMIT_PER_SECOND: float = 10.0  # 0 disables the limit
+    PROVISIONER_TIMEOUT_SECONDS: float = 60.0
+
+    # Mock driver: mean latency, its distribution
+    # ("fixed" | "uniform" | "exponential" | "lognormal"), the lognormal
+    # tail shape, and the fraction of provisions that fail
+    MOCK_PROVISION_DELAY_SECONDS: float = 5
+    MOCK_PROVISION_LATENCY_DISTRIBUTION: str = "fixed"
+    MOCK_PROVISION_LATENCY_SIGMA: float = 0.5
+    MOCK_PROVISION_FAILURE_RATE: float = 0.0
+
+    # ── Retry / Dead-letter ───────────────────────────────────────────────
+    # Failed provisions are re-published to KAFKA_RETRY_TOPIC with an
+    # exponential, jittered delay; after MAX_PROVISION_ATTEMPTS they are
+    # parked on KAFKA_DLQ_TOPIC (and the dead_letters table) for replay.
+    KAFKA_RETRY_TOPIC: str = "provision-requests-retry"
+    KAFKA_RETRY_GROUP_ID: str = "provision-retry-group"
+    KAFKA_DLQ_TOPIC: str = "provision-requests-dlq"
+    MAX_PROVISION_ATTEMPTS: int = 5
+    RETRY_BASE_DELAY_SECONDS: float = 2.0
+    RETRY_MAX_DELAY_SECONDS: float = 60.0
+
+    @model_validator(mode="after")
+    def _check_lease_covers_provision(self) -> "WorkerSettings":
+        """A lease that can lapse mid-provision lets another worker reclaim
+        and re-provision a live request.  The lease starts once a pool client
+        is checked out, so it only has to outlast the driver timeout."""
+        if self.PROVISION_LEASE_SECONDS <= self.PROVISIONER_TIMEOUT_SECONDS:
+            raise ValueError(
+                "PROVISION_LEASE_SECONDS must exceed PROVISIONER_TIMEOUT_SECONDS "
+                f"({self.PROVISION_LEASE_SECONDS} <= {self.PROVISIONER_TIMEOUT_SECONDS})"
+            )
+        return self
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
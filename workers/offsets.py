@@ -0,0 +1,74 @@
+"""
+Manual offset tracking for concurrently processed Kafka messages.
+
+Messages from one partition finish out of order, so the offset that is safe
+to commit is the lowest one still in flight (or one past the highest
+dispatched offset once nothing is in flight).  Anything not yet committed
+is redelivered to the next consumer after a restart or rebalance.
+"""
+
+from __future__ import annotations
+
+from typing import Awaitable, Callable
+
+from aiokafka import ConsumerRebalanceListener, TopicPartition
+
+
+class OffsetTracker:
+    """Tracks in-flight offsets per partition and computes what may be committed."""
+
+    def __init__(self) -> None:
+        self._in_flight: dict[TopicPartition, set[int]] = {}
+        self._next: dict[TopicPartition, int] = {}
+        self._committed: dict[TopicPartition, int] = {}
+
+    def track(self, tp: TopicPartition, offset: int) -> None:
+        """Record that ``offset`` has been dispatched."""
+        self._in_flight.setdefault(tp, set()).add(offset)
+        self._next[tp] = max(self._next.get(tp, 0), offset + 1)
+
+    def done(self, tp: TopicPartition, offset: int) -> None:
+        """Record that ``offset`` is finished (processed or requeued elsewhere)."""
+        self._in_flight.get(tp, set()).discard(offset)
+
+    def committable(self) -> dict[TopicPartition, int]:
+        """Offsets that advanced since the last ``mark_committed``."""
+        offsets = {}
+        for tp, next_offset in self._next.items():
+            pending = self._in_flight.get(tp)
+            offset = min(pending) if pending else next_offset
+            if offset > self._committed.get(tp, -1):
+                offsets[tp] = offset
+        return offsets
+
+    def mark_committed(self, offsets: dict[TopicPartition, int]) -> None:
+        self._committed.update(offsets)
+
+    def forget(self, tp: TopicPartition) -> None:
+        """Drop all state for ``tp`` (e.g. after a rebalance revoked it)."""
+        self._in_flight.pop(tp, None)
+        self._next.pop(tp, None)
+        self._committed.pop(tp, None)
+
+
+class RevokeListener(ConsumerRebalanceListener):
+    """Commits what it can, then forgets partitions a rebalance takes away.
+
+    Without this the tracker keeps offering revoked partitions, and every
+    later commit fails with "partition is not assigned".
+    """
+
+    def __init__(
+        self, tracker: OffsetTracker, commit: Callable[[], Awaitable[None]]
+    ) -> None:
+        self._tracker = tracker
+        self._commit = commit
+
+    async def on_partitions_revoked(self, revoked) -> None:
+        # Still assigned at this point, so progress made so far can be kept
+        await self._commit()
+        for tp in revoked:
+            self._tracker.forget(tp)
+
+    async def on_partitions_assigned(self, assigned) -> None:
+        pass
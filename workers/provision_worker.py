@@ -5,9 +5,13 @@ Kafka Worker Agent for GPU Provisioning Requests
 This worker:
 1. Consumes messages from the 'provision-requests' Kafka topic
 2. Updates database status: pending → provisioning → completed
-3. Simulates provisioning work with a configurable delay
-4. Generates mock kubeconfig data for completed requests
-5. Handles errors gracefully and updates status to 'failed'
+3. Provisions through a pluggable driver pool (mock driver by default,
+   simulating backend latency/failure distributions)
+4. Stores the kubeconfig returned by the driver for completed requests
+5. Drains in-flight work on shutdown, committing offsets manually and
+   requeueing anything unfinished; expired leases are reclaimed at startup
+6. Retries failures with exponential backoff via a delayed-retry topic,
+   dead-lettering them (status 'failed') once attempts are exhausted
 """
 
 import asyncio
@@ -15,25 +19,71 @@ import json
 import logging
 import signal
 import sys
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from aiokafka import AIOKafkaConsumer
-from sqlalchemy import select
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
+from aiokafka.errors import KafkaError
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 # Add parent directory to path to import backend models
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 
-from app.models import ProvisionRequest, Base
+from app.logging_setup import configure_logging, parse_sample_rates
+from app.models import DeadLetter, ProvisionRequest, Base
+from app.sharding import Shard, get_shard, parse_shards
+from app.tracing import (
+    configure_tracing,
+    extract_kafka_context,
+    get_tracer,
+    shutdown_tracing,
+)
 from config import settings
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+from offsets import OffsetTracker, RevokeListener
+from provisioners import DriverPool
+from retry import RetryScheduler
+
+# Configure logging (structured, written off the event loop)
+configure_logging(
+    level=settings.LOG_LEVEL,
+    fmt=settings.LOG_FORMAT,
+    sample_rates=parse_sample_rates(settings.LOG_SAMPLE_RATES),
 )
 logger = logging.getLogger(__name__)
+tracer = get_tracer(__name__)
+
+
+def bind_to_shard() -> Shard:
+    """Point this process's settings at its shard's database, topics and cluster."""
+    shards = parse_shards(settings.SHARDS, settings.DATABASE_URL, settings.KAFKA_TOPIC)
+    shard = get_shard(shards, settings.WORKER_SHARD) if settings.WORKER_SHARD else shards[0]
+
+    if settings.SHARDS.strip():
+        settings.DATABASE_URL = shard.database_url
+        settings.KAFKA_TOPIC = shard.kafka_topic
+        settings.PROVISION_CLUSTER = shard.cluster
+        settings.KAFKA_GROUP_ID = f"{settings.KAFKA_GROUP_ID}-{shard.name}"
+        settings.KAFKA_RETRY_GROUP_ID = f"{settings.KAFKA_RETRY_GROUP_ID}-{shard.name}"
+        settings.KAFKA_RETRY_TOPIC = f"{shard.kafka_topic}-retry"
+        settings.KAFKA_DLQ_TOPIC = f"{shard.kafka_topic}-dlq"
+
+    logger.info(
+        "Serving shard %s (topic=%s, cluster=%s)",
+        shard.name,
+        settings.KAFKA_TOPIC,
+        settings.PROVISION_CLUSTER,
+    )
+    return shard
+
+
+def _topic_partition(message) -> TopicPartition | None:
+    """The Kafka partition a message came from (None for DB-polling messages)."""
+    if getattr(message, "topic", None) is None:
+        return None
+    return TopicPartition(message.topic, message.partition)
 
 
 class ProvisionWorker:
@@ -41,8 +91,18 @@ class ProvisionWorker:
 
     def __init__(self):
         self.consumer = None
+        self.producer = None
+        self.retry_scheduler = None
+        self.retry_task = None
         self.engine = None
         self.async_session = None
+        self.provisioner = None
+        self.in_flight: dict[asyncio.Task, object] = {}  # task -> message
+        self.claimed: set[asyncio.Task] = set()  # in-flight tasks holding a lease
+        self.offsets = OffsetTracker()
+        self._slots = asyncio.Semaphore(settings.MAX_CONCURRENT_PROVISIONS)
+        self._stop_lock = asyncio.Lock()
+        self._stopped = False
         self.running = False
 
     async def setup(self):
@@ -59,6 +119,21 @@ class ProvisionWorker:
             await conn.run_sync(Base.metadata.create_all)
         logger.info("Database connection established")
 
+        # Setup provisioning backend
+        self.provisioner = DriverPool(
+            settings.PROVISIONER_DRIVER,
+            size=settings.PROVISIONER_POOL_SIZE,
+            rate_limit=settings.PROVISIONER_RATE_LIMIT_PER_SECOND,
+            timeout_seconds=settings.PROVISIONER_TIMEOUT_SECONDS,
+        )
+        logger.info(
+            "Provisioner ready: driver=%s, pool=%d, rate=%.1f/s, timeout=%.0fs",
+            settings.PROVISIONER_DRIVER,
+            self.provisioner.size,
+            settings.PROVISIONER_RATE_LIMIT_PER_SECOND,
+            settings.PROVISIONER_TIMEOUT_SECONDS,
+        )
+
         # Setup Kafka consumer
         logger.info(
             "Connecting to Kafka: %s, topic: %s, group: %s",
@@ -67,18 +142,44 @@ class ProvisionWorker:
             settings.KAFKA_GROUP_ID,
         )
         self.consumer = AIOKafkaConsumer(
-            settings.KAFKA_TOPIC,
             bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
             group_id=settings.KAFKA_GROUP_ID,
             value_deserializer=lambda m: json.loads(m.decode("utf-8")),
             auto_offset_reset="earliest",  # Start from beginning if no offset
-            enable_auto_commit=True,
+            # Offsets are committed only once a message is fully handled
+            # (see commit_offsets), so a crash or rolling deploy loses nothing
+            enable_auto_commit=False,
+        )
+        self.consumer.subscribe(
+            [settings.KAFKA_TOPIC],
+            listener=RevokeListener(self.offsets, self.commit_offsets),
         )
         # await self.consumer.start() -> Moved to run() to handle failure gracefully
         logger.info("Kafka consumer initialized (connection pending)")
 
     async def teardown(self):
         """Cleanup resources."""
+        for task in list(self.in_flight):
+            task.cancel()
+        if self.in_flight:
+            await asyncio.gather(*self.in_flight, return_exceptions=True)
+
+        if self.provisioner:
+            await self.provisioner.close()
+            self.provisioner = None
+
+        if self.retry_task:
+            self.retry_task.cancel()
+            self.retry_task = None
+
+        if self.retry_scheduler:
+            await self.retry_scheduler.stop()
+
+        if self.producer:
+            await self.producer.stop()
+            self.producer = None
+            logger.info("Kafka producer stopped")
+
         if self.consumer:
             await self.consumer.stop()
             logger.info("Kafka consumer stopped")
@@ -87,6 +188,8 @@ class ProvisionWorker:
             await self.engine.dispose()
             logger.info("Database connection closed")
 
+        shutdown_tracing()
+
     async def update_request_status(
         self,
         request_id: str,
@@ -94,7 +197,25 @@ class ProvisionWorker:
         kubeconfig: str | None = None,
         error_msg: str | None = None,
     ) -> bool:
-        """Update the status of a provision request in the database."""
+        """Update the status of a provision request in the database.
+
+        Releases any worker lease on the row.  Returns False if the request
+        does not exist.  Database errors are re-raised so the caller can
+        treat them as retryable.
+        """
+        with tracer.start_as_current_span(f"status.{status}") as span:
+            span.set_attribute("provision.request_id", request_id)
+            return await self._update_request_status(
+                request_id, status, kubeconfig, error_msg
+            )
+
+    async def _update_request_status(
+        self,
+        request_id: str,
+        status: str,
+        kubeconfig: str | None,
+        error_msg: str | None,
+    ) -> bool:
         async with self.async_session() as session:
             try:
                 # Fetch the request
@@ -110,6 +231,7 @@ class ProvisionWorker:
                 # Update fields
                 request.status = status
                 request.updated_at = datetime.now(timezone.utc)
+                request.leased_until = None
 
                 if kubeconfig is not None:
                     request.kubeconfig = kubeconfig
@@ -118,7 +240,12 @@ class ProvisionWorker:
                     request.error_msg = error_msg
 
                 await session.commit()
-                logger.info("Updated request %s to status: %s", request_id, status)
+                logger.info(
+                    "Updated request %s to status: %s",
+                    request_id,
+                    status,
+                    extra={"request_id": request_id, "status": status},
+                )
                 return True
 
             except Exception as exc:
@@ -126,75 +253,222 @@ class ProvisionWorker:
                     "Failed to update request %s: %s", request_id, exc, exc_info=True
                 )
                 await session.rollback()
-                return False
-
-    def generate_mock_kubeconfig(
-        self, request_id: str, user_id: str, gpu_count: int, duration_hours: int
-    ) -> str:
-        """Generate a mock kubeconfig YAML for the provisioned resources."""
-        return f"""apiVersion: v1
-kind: Config
-clusters:
-- cluster:
-    server: https://nvidia-gpu-cluster.example.com:6443
-    certificate-authority-data: LS0tLS1CRUdJTiBDRVJUSUZJQ0FURS0tLS0tCk1JSUN5RENDQWJDZ0F3SUJBZ0lCQURBTkJna3Foa2lHOXcwQkFRc0ZBREFWTVJNd0VRWURWUVFERXdwcmRXSmwKY201bGRHVnpNQjRYRFRJME1ERXdNVEF3TURBd01Gb1hEVE0wTURFd01UQXdNREF3TUZvd0ZURVRNQkVHQTFVRQpBeE1LYTNWaVpYSnVaWFJsY3pDQ0FTSXdEUVlKS29aSWh2Y05BUUVCQlFBRGdnRVBBRENDQVFvQ2dnRUJBTEhOCg==
-  name: nvidia-gpu-cluster
-contexts:
-- context:
-    cluster: nvidia-gpu-cluster
-    namespace: gpu-{user_id}
-    user: {user_id}
-  name: nvidia-gpu-context
-current-context: nvidia-gpu-context
-users:
-- name: {user_id}
-  user:
-    token: mock-jwt-token-{request_id[:8]}
-
-# Provisioned Resources:
-# - Request ID: {request_id}
-# - User: {user_id}
-# - GPUs: {gpu_count}
-# - Duration: {duration_hours} hours
-# - Provisioned at: {datetime.now(timezone.utc).isoformat()}
-"""
+                raise
+
+    async def claim_request(self, request_id: str) -> bool:
+        """Atomically move a request to 'provisioning' under a fresh lease.
+
+        Succeeds only if the request is 'pending' or its previous lease has
+        expired, so duplicate or redelivered messages for a request that is
+        being (or has been) handled elsewhere are skipped.
+        """
+        with tracer.start_as_current_span("status.provisioning") as span:
+            span.set_attribute("provision.request_id", request_id)
+            now = datetime.now(timezone.utc)
+
+            async with self.async_session() as session:
+                result = await session.execute(
+                    update(ProvisionRequest)
+                    .where(ProvisionRequest.id == request_id)
+                    .where(
+                        or_(
+                            ProvisionRequest.status == "pending",
+                            (ProvisionRequest.status == "provisioning")
+                            & (ProvisionRequest.leased_until < now),
+                        )
+                    )
+                    .values(
+                        status="provisioning",
+                        updated_at=now,
+                        leased_until=now
+                        + timedelta(seconds=settings.PROVISION_LEASE_SECONDS),
+                    )
+                )
+                await session.commit()
+
+            claimed = result.rowcount == 1
+            if claimed:
+                logger.info(
+                    "Updated request %s to status: provisioning",
+                    request_id,
+                    extra={"request_id": request_id, "status": "provisioning"},
+                )
+            return claimed
+
+    async def release_claim(self, request_id: str) -> bool:
+        """Reset a request this worker claimed back to 'pending'.
+
+        Conditional on the row still being 'provisioning', so a request
+        that completed meanwhile keeps its result.  Returns True if reset.
+        """
+        with tracer.start_as_current_span("status.pending") as span:
+            span.set_attribute("provision.request_id", request_id)
+            async with self.async_session() as session:
+                result = await session.execute(
+                    update(ProvisionRequest)
+                    .where(ProvisionRequest.id == request_id)
+                    .where(ProvisionRequest.status == "provisioning")
+                    .values(
+                        status="pending",
+                        updated_at=datetime.now(timezone.utc),
+                        leased_until=None,
+                    )
+                )
+                await session.commit()
+            return result.rowcount == 1
+
+    async def is_pending(self, request_id: str) -> bool:
+        """True if the request exists and is waiting to be claimed."""
+        async with self.async_session() as session:
+            status = await session.scalar(
+                select(ProvisionRequest.status).where(ProvisionRequest.id == request_id)
+            )
+        return status == "pending"
+
+    async def reclaim_orphaned_requests(self) -> int:
+        """Reset 'provisioning' rows whose lease has lapsed back to 'pending'.
+
+        Run at startup: a worker that died mid-provision leaves its rows in
+        'provisioning'.  With Kafka available they are re-published; in DB
+        polling mode the poller picks them up as 'pending'.
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            async with self.async_session() as session:
+                result = await session.execute(
+                    select(ProvisionRequest)
+                    .where(ProvisionRequest.status == "provisioning")
+                    .where(
+                        or_(
+                            ProvisionRequest.leased_until.is_(None),
+                            ProvisionRequest.leased_until < now,
+                        )
+                    )
+                )
+                orphans = result.scalars().all()
+
+                for request in orphans:
+                    request.status = "pending"
+                    request.leased_until = None
+                    request.updated_at = now
+                await session.commit()
+
+            for request in orphans:
+                logger.warning("Reclaimed orphaned request %s", request.id)
+                if self.producer:
+                    await self.producer.send_and_wait(
+                        settings.KAFKA_TOPIC,
+                        value={
+                            "request_id": request.id,
+                            "user_id": request.user_id,
+                            "gpu_count": request.gpu_count,
+                            "duration_hours": request.duration_hours,
+                        },
+                        key=request.user_id.encode("utf-8"),
+                    )
+        except Exception as exc:
+            logger.error("Orphan sweep failed: %s", exc, exc_info=True)
+            return 0
+
+        return len(orphans)
+
+    async def record_dead_letter(self, data: dict, error: str) -> None:
+        """Persist an exhausted event so it can be inspected and replayed."""
+        async with self.async_session() as session:
+            session.add(
+                DeadLetter(
+                    request_id=data["request_id"],
+                    payload=json.dumps(data),
+                    attempts=data.get("attempt", 1),
+                    error_msg=error,
+                )
+            )
+            await session.commit()
+
+    async def handle_failure(self, data: dict, exc: Exception) -> None:
+        """Schedule a delayed retry, or dead-letter the event if out of attempts.
+
+        Without a Kafka producer (DB polling mode) there is no retry topic,
+        so the request is failed immediately.
+        """
+        request_id = data.get("request_id")
+        error = f"Worker error: {exc}"
+
+        try:
+            if self.retry_scheduler and self.retry_scheduler.should_retry(data):
+                delay = await self.retry_scheduler.schedule_retry(data, error)
+                await self.update_request_status(
+                    request_id,
+                    "pending",
+                    error_msg=f"{error} (attempt {data.get('attempt', 1)}, retrying in {delay:.0f}s)",
+                )
+                return
+
+            if self.retry_scheduler:
+                await self.retry_scheduler.dead_letter(data, error)
+            await self.record_dead_letter(data, error)
+            await self.update_request_status(request_id, "failed", error_msg=error)
+
+        except Exception as handler_exc:
+            logger.error(
+                "Failed to handle failure for request %s: %s",
+                request_id,
+                handler_exc,
+                exc_info=True,
+            )
 
     async def process_message(self, message):
-        """Process a single provision request message."""
+        """Process a single provision request message.
+
+        Continues the trace carried in the Kafka headers (if any) so the
+        worker's stages show up under the API request that produced them.
+        """
+        parent = extract_kafka_context(getattr(message, "headers", None))
+        with tracer.start_as_current_span(
+            "provision", context=parent, kind=SpanKind.CONSUMER
+        ) as span:
+            span.set_attribute("provision.request_id", str(message.value.get("request_id")))
+            span.set_attribute("provision.attempt", message.value.get("attempt", 1))
+            await self._process_message(message)
+
+    async def _process_message(self, message):
+        data = message.value
         try:
-            data = message.value
             request_id = data.get("request_id")
             user_id = data.get("user_id")
             gpu_count = data.get("gpu_count")
             duration_hours = data.get("duration_hours")
 
             logger.info(
-                "Processing provision request: %s (user=%s, gpus=%d, duration=%dh)",
+                "Processing provision request: %s (user=%s, gpus=%d, duration=%dh, attempt=%d)",
                 request_id,
                 user_id,
                 gpu_count,
                 duration_hours,
+                data.get("attempt", 1),
+                extra={"request_id": request_id, "attempt": data.get("attempt", 1)},
             )
 
-            # Step 1: Update status to 'provisioning'
-            success = await self.update_request_status(request_id, "provisioning")
-            if not success:
-                logger.error("Failed to update status to provisioning, skipping")
-                return
-
-            # Step 2: Simulate provisioning work
-            logger.info(
-                "Simulating provisioning work for %d seconds...",
-                settings.MOCK_PROVISION_DELAY_SECONDS,
-            )
-            await asyncio.sleep(settings.MOCK_PROVISION_DELAY_SECONDS)
-
-            # Step 3: Generate mock kubeconfig
-            kubeconfig = self.generate_mock_kubeconfig(
-                request_id, user_id, gpu_count, duration_hours
-            )
+            async with self.provisioner.checkout() as driver:
+                # Step 1: Claim the request (status 'provisioning' + lease).
+                # Only now that a client is ours does the lease clock start,
+                # so it just has to outlast PROVISIONER_TIMEOUT_SECONDS.
+                if not await self.claim_request(request_id):
+                    logger.warning(
+                        "Request %s is missing, finished or leased elsewhere, skipping",
+                        request_id,
+                    )
+                    return
+                self.claimed.add(asyncio.current_task())
+
+                # Step 2: Provision on the checked-out client
+                with tracer.start_as_current_span("provision.work") as work_span:
+                    work_span.set_attribute("provisioner.driver", settings.PROVISIONER_DRIVER)
+                    kubeconfig = await self.provisioner.provision_with(
+                        driver, request_id, user_id, gpu_count, duration_hours
+                    )
 
-            # Step 4: Update status to 'completed' with kubeconfig
+            # Step 3: Update status to 'completed' with kubeconfig
             success = await self.update_request_status(
                 request_id, "completed", kubeconfig=kubeconfig
             )
@@ -204,6 +478,7 @@ users:
                     "✅ Successfully provisioned request %s for user %s",
                     request_id,
                     user_id,
+                    extra={"request_id": request_id, "user_id": user_id},
                 )
             else:
                 logger.error("Failed to update status to completed")
@@ -212,13 +487,11 @@ users:
             logger.error(
                 "Error processing message: %s", exc, exc_info=True
             )
-            # Try to update status to failed
+            span = trace.get_current_span()
+            span.record_exception(exc)
+            span.set_status(Status(StatusCode.ERROR, str(exc)))
             if "request_id" in data:
-                await self.update_request_status(
-                    data["request_id"],
-                    "failed",
-                    error_msg=f"Worker error: {str(exc)}",
-                )
+                await self.handle_failure(data, exc)
 
     async def run(self):
         """Main worker loop - consume and process messages."""
@@ -229,13 +502,22 @@ users:
             # Try to start Kafka consumer
             await self.consumer.start()
             logger.info("Kafka consumer started successfully - waiting for messages...")
-            
-            async for message in self.consumer:
-                if not self.running:
-                    break
-                await self.process_message(message)
+
+            await self.start_retry_pipeline()
+            await self.reclaim_orphaned_requests()
+
+            while self.running:
+                batches = await self.consumer.getmany(timeout_ms=1000)
+                for records in batches.values():
+                    for message in records:
+                        if not await self.dispatch(message):
+                            break
+                await self.commit_offsets()
 
         except Exception as exc:
+            if not self.running:
+                # Consumer was stopped underneath us by shutdown()
+                return
             logger.warning(f"⚠️ Kafka unavailable: {exc}")
             logger.info("🔄 Switching to DB POLLING MODE (Mock Flow)")
             
@@ -244,9 +526,146 @@ users:
         finally:
             logger.info("Worker loop exiting")
 
+    async def dispatch(self, message) -> bool:
+        """Process ``message`` in the background once a concurrency slot frees up.
+
+        Blocks the consumer loop only while MAX_CONCURRENT_PROVISIONS
+        messages are already in flight.  Returns False (without dispatching)
+        if the worker started stopping while waiting for a slot.  DB-polling
+        pseudo-messages go through here too so drain() covers them; they
+        have no offset to track.
+        """
+        await self._slots.acquire()
+        if not self.running:
+            self._slots.release()
+            return False
+
+        tp = _topic_partition(message)
+        if tp is not None:
+            self.offsets.track(tp, message.offset)
+        task = asyncio.create_task(self.process_message(message))
+        self.in_flight[task] = message
+
+        def _done(t: asyncio.Task) -> None:
+            self.in_flight.pop(t, None)
+            self._slots.release()
+            # A cancelled task is not finished: drain() requeues it first
+            if not t.cancelled():
+                self.claimed.discard(t)
+                if tp is not None:
+                    self.offsets.done(tp, message.offset)
+
+        task.add_done_callback(_done)
+        return True
+
+    async def commit_offsets(self):
+        """Commit every offset whose messages are fully handled."""
+        offsets = self.offsets.committable()
+        if not offsets:
+            return
+        try:
+            await self.consumer.commit(offsets)
+            self.offsets.mark_committed(offsets)
+        except KafkaError as exc:
+            # Uncommitted offsets are simply redelivered
+            logger.warning("Offset commit failed: %s", exc)
+
+    async def drain(self):
+        """Wait for in-flight provisions, then requeue whatever is left.
+
+        Waits up to DRAIN_TIMEOUT_SECONDS.  Unfinished provisions are
+        cancelled and handed back via requeue(), after which their offsets
+        are safe to commit.
+        """
+        if self.in_flight:
+            logger.info(
+                "Draining %d in-flight provision(s) (up to %gs)...",
+                len(self.in_flight),
+                settings.DRAIN_TIMEOUT_SECONDS,
+            )
+            _, pending = await asyncio.wait(
+                list(self.in_flight), timeout=settings.DRAIN_TIMEOUT_SECONDS
+            )
+
+            # Snapshot messages first: done-callbacks drop tasks from
+            # in_flight as they finish, including during the gather below
+            unfinished = {task: self.in_flight[task] for task in pending}
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+            # A task may have completed between the timeout and cancel();
+            # only the ones actually cancelled still need a home
+            for task, message in unfinished.items():
+                if task.cancelled():
+                    await self.requeue(message, claimed=task in self.claimed)
+                self.claimed.discard(task)
+
+        if self.consumer and self.producer:
+            await self.commit_offsets()
+
+    async def requeue(self, message, claimed: bool):
+        """Hand an unfinished message back to the fleet.
+
+        A request this worker claimed is reset to 'pending' only while it is
+        still 'provisioning'; one cancelled before its claim is left alone.
+        Either way the event is re-published only if the request is now
+        'pending', so finished requests or ones leased elsewhere never run
+        twice.
+        """
+        data = message.value
+        request_id = data.get("request_id")
+        tp = _topic_partition(message)
+        try:
+            if claimed:
+                pending = await self.release_claim(request_id)
+            else:
+                pending = await self.is_pending(request_id)
+
+            # Polling-mode messages need no re-publish: 'pending' is enough
+            if pending and tp is not None and self.producer:
+                await self.producer.send_and_wait(
+                    settings.KAFKA_TOPIC,
+                    value=data,
+                    key=getattr(message, "key", None),
+                    headers=list(getattr(message, "headers", None) or ()),
+                )
+            if tp is not None:
+                self.offsets.done(tp, message.offset)
+            if pending:
+                logger.warning("Requeued unfinished request %s", request_id)
+        except Exception as exc:
+            # Offset stays uncommitted, so Kafka redelivers it; the lease
+            # lets the startup sweep reclaim the row if the reset failed.
+            logger.error("Failed to requeue request %s: %s", request_id, exc)
+
+    async def start_retry_pipeline(self):
+        """Start the producer and retry-topic consumer used for failed events."""
+        self.producer = AIOKafkaProducer(
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+        )
+        await self.producer.start()
+
+        scheduler = RetryScheduler(self.producer)
+        await scheduler.start()
+        self.retry_scheduler = scheduler
+        self.retry_task = asyncio.create_task(scheduler.run())
+        self.retry_task.add_done_callback(self._on_retry_task_done)
+
+    def _on_retry_task_done(self, task: asyncio.Task) -> None:
+        """Surface an unexpected retry-loop crash instead of losing it silently."""
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.critical(
+            "Retry consumer crashed; retries will not be re-queued until restart",
+            exc_info=task.exception(),
+        )
+
     async def run_mock_polling_loop(self):
         """Poll the database for pending requests (Fallback for when Kafka is down)."""
         logger.info("Started DB Polling Loop - checking every 2 seconds...")
+        await self.reclaim_orphaned_requests()
         
         while self.running:
             try:
@@ -257,10 +676,13 @@ users:
                     )
                     pending_requests = result.scalars().all()
 
-                # 2. Process them
+                # 2. Dispatch them (skipping ones already in flight here)
+                in_flight_ids = {m.value["request_id"] for m in self.in_flight.values()}
                 for req in pending_requests:
                     if not self.running:
                         break
+                    if req.id in in_flight_ids:
+                        continue
                         
                     logger.info(f"📥 Found pending request via polling: {req.id}")
                     
@@ -274,7 +696,8 @@ users:
                         }
                     })
                     
-                    await self.process_message(mock_message)
+                    if not await self.dispatch(mock_message):
+                        break
 
                 # 3. Sleep
                 await asyncio.sleep(2)
@@ -284,18 +707,35 @@ users:
                 await asyncio.sleep(5)
 
     async def shutdown(self, sig=None):
-        """Graceful shutdown handler."""
-        if sig:
-            logger.info("Received signal %s - shutting down gracefully...", sig.name)
-        else:
-            logger.info("Shutting down gracefully...")
+        """Graceful shutdown handler: stop fetching, drain, then tear down.
 
-        self.running = False
-        await self.teardown()
+        Safe to call more than once (signal handler and ``main``'s finally);
+        later calls wait for the first to finish.
+        """
+        async with self._stop_lock:
+            if self._stopped:
+                return
+
+            if sig:
+                logger.info("Received signal %s - shutting down gracefully...", sig.name)
+            else:
+                logger.info("Shutting down gracefully...")
+
+            self.running = False
+            await self.drain()
+            await self.teardown()
+            self._stopped = True
 
 
 async def main():
     """Main entry point."""
+    configure_tracing(
+        settings.TRACING_SERVICE_NAME,
+        exporter=settings.TRACING_EXPORTER,
+        file_path=settings.TRACING_FILE_PATH,
+        otlp_endpoint=settings.TRACING_OTLP_ENDPOINT,
+    )
+    bind_to_shard()
     worker = ProvisionWorker()
 
     # Setup signal handlers for graceful shutdown
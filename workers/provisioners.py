@@ -0,0 +1,238 @@
+"""
+Provisioning backend drivers.
+
+``ProvisionWorker`` never talks to a backend directly: it calls a
+``DriverPool``, which hands the request to one of a fixed number of driver
+clients, subject to a global rate limit and a per-call timeout.  Drivers:
+
+  - ``mock``: simulates backend latency (fixed / uniform / exponential /
+    lognormal) and a random failure rate, then returns a mock kubeconfig
+
+A real backend (e.g. Kubernetes) plugs in by subclassing
+``ProvisionerDriver`` and registering it in ``create_driver``.
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+from config import settings
+
+
+class ProvisionError(Exception):
+    """The backend failed to provision the request (retryable)."""
+
+
+class ProvisionTimeoutError(ProvisionError):
+    """The driver did not finish within PROVISIONER_TIMEOUT_SECONDS."""
+
+
+class ProvisionerDriver(abc.ABC):
+    """A client for one provisioning backend."""
+
+    @abc.abstractmethod
+    async def provision(
+        self, request_id: str, user_id: str, gpu_count: int, duration_hours: int
+    ) -> str:
+        """Provision the resources and return a kubeconfig for them."""
+
+    async def close(self) -> None:
+        """Release any connections held by the driver."""
+
+
+class MockProvisioner(ProvisionerDriver):
+    """Simulated backend with a configurable latency and failure distribution."""
+
+    def __init__(
+        self,
+        distribution: str = "fixed",
+        mean_seconds: float = 5.0,
+        sigma: float = 0.5,
+        failure_rate: float = 0.0,
+        cluster: str = "nvidia-gpu-cluster",
+    ) -> None:
+        if distribution not in ("fixed", "uniform", "exponential", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {distribution!r}")
+        self.distribution = distribution
+        self.mean_seconds = mean_seconds
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self.cluster = cluster
+
+    def sample_latency(self) -> float:
+        """Draw one simulated backend latency (seconds) with the configured mean."""
+        mean = self.mean_seconds
+        if mean <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            return random.uniform(0, 2 * mean)
+        if self.distribution == "exponential":
+            return random.expovariate(1 / mean)
+        if self.distribution == "lognormal":
+            # Pick mu so the distribution's mean (not median) equals `mean`;
+            # sigma controls how heavy the tail is.
+            mu = math.log(mean) - self.sigma**2 / 2
+            return random.lognormvariate(mu, self.sigma)
+        return mean
+
+    async def provision(
+        self, request_id: str, user_id: str, gpu_count: int, duration_hours: int
+    ) -> str:
+        await asyncio.sleep(self.sample_latency())
+
+        if random.random() < self.failure_rate:
+            raise ProvisionError(f"Mock backend failure for request {request_id}")
+
+        return self.generate_mock_kubeconfig(
+            request_id, user_id, gpu_count, duration_hours
+        )
+
+    def generate_mock_kubeconfig(
+        self, request_id: str, user_id: str, gpu_count: int, duration_hours: int
+    ) -> str:
+        """Generate a mock kubeconfig YAML for the provisioned resources."""
+        return f"""apiVersion: v1
+kind: Config
+clusters:
+- cluster:
+    server: https://{self.cluster}.example.com:6443
+    certificate-authority-data: LS0tLS1CRUdJTiBDRVJUSUZJQ0FURS0tLS0tCk1JSUN5RENDQWJDZ0F3SUJBZ0lCQURBTkJna3Foa2lHOXcwQkFRc0ZBREFWTVJNd0VRWURWUVFERXdwcmRXSmwKY201bGRHVnpNQjRYRFRJME1ERXdNVEF3TURBd01Gb1hEVE0wTURFd01UQXdNREF3TUZvd0ZURVRNQkVHQTFVRQpBeE1LYTNWaVpYSnVaWFJsY3pDQ0FTSXdEUVlKS29aSWh2Y05BUUVCQlFBRGdnRVBBRENDQVFvQ2dnRUJBTEhOCg==
+  name: {self.cluster}
+contexts:
+- context:
+    cluster: {self.cluster}
+    namespace: gpu-{user_id}
+    user: {user_id}
+  name: nvidia-gpu-context
+current-context: nvidia-gpu-context
+users:
+- name: {user_id}
+  user:
+    token: mock-jwt-token-{request_id[:8]}
+
+# Provisioned Resources:
+# - Request ID: {request_id}
+# - User: {user_id}
+# - GPUs: {gpu_count}
+# - Duration: {duration_hours} hours
+# - Provisioned at: {datetime.now(timezone.utc).isoformat()}
+"""
+
+
+def create_driver(name: str) -> ProvisionerDriver:
+    """Build a driver instance from its PROVISIONER_DRIVER name."""
+    if name == "mock":
+        return MockProvisioner(
+            distribution=settings.MOCK_PROVISION_LATENCY_DISTRIBUTION,
+            mean_seconds=settings.MOCK_PROVISION_DELAY_SECONDS,
+            sigma=settings.MOCK_PROVISION_LATENCY_SIGMA,
+            failure_rate=settings.MOCK_PROVISION_FAILURE_RATE,
+            cluster=settings.PROVISION_CLUSTER,
+        )
+    raise ValueError(f"Unknown provisioner driver: {name!r}")
+
+
+class RateLimiter:
+    """Token bucket shared by every caller of a pool (``rate`` calls/second)."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class DriverPool:
+    """A fixed set of driver clients behind a rate limit and per-call timeout.
+
+    At most ``size`` provisions run at once; each one checks a client out of
+    the pool, so a driver instance is never used by two calls concurrently.
+    Cancelling the calling task cancels the backend call and returns the
+    client to the pool.
+
+    Callers that must do work only once a client is actually available
+    (e.g. take a lease) use ``checkout()`` + ``provision_with()``.
+    """
+
+    def __init__(
+        self,
+        driver_name: str,
+        size: int,
+        rate_limit: float,
+        timeout_seconds: float,
+    ) -> None:
+        self.driver_name = driver_name
+        self.timeout_seconds = timeout_seconds
+        self._drivers = [create_driver(driver_name) for _ in range(max(size, 1))]
+        self._idle: asyncio.Queue[ProvisionerDriver] = asyncio.Queue()
+        for driver in self._drivers:
+            self._idle.put_nowait(driver)
+        self._limiter = RateLimiter(rate_limit, burst=len(self._drivers))
+
+    @property
+    def size(self) -> int:
+        return len(self._drivers)
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[ProvisionerDriver]:
+        """Wait for an idle client and a rate-limit token; return the client on exit."""
+        driver = await self._idle.get()
+        try:
+            await self._limiter.acquire()
+            yield driver
+        finally:
+            self._idle.put_nowait(driver)
+
+    async def provision_with(
+        self,
+        driver: ProvisionerDriver,
+        request_id: str,
+        user_id: str,
+        gpu_count: int,
+        duration_hours: int,
+    ) -> str:
+        """Run one provision on a checked-out client, bounded by the timeout."""
+        try:
+            return await asyncio.wait_for(
+                driver.provision(request_id, user_id, gpu_count, duration_hours),
+                timeout=self.timeout_seconds,
+            )
+        except asyncio.TimeoutError as exc:
+            raise ProvisionTimeoutError(
+                f"{self.driver_name} driver timed out after {self.timeout_seconds}s"
+            ) from exc
+
+    async def provision(
+        self, request_id: str, user_id: str, gpu_count: int, duration_hours: int
+    ) -> str:
+        async with self.checkout() as driver:
+            return await self.provision_with(
+                driver, request_id, user_id, gpu_count, duration_hours
+            )
+
+    async def close(self) -> None:
+        for driver in self._drivers:
+            await driver.close()
@@ -0,0 +1,166 @@
+"""
+Delayed-retry and dead-letter handling for failed provision events.
+
+Failed events are never retried in-line: the worker re-publishes them to
+a retry topic stamped with ``attempt`` and ``retry_at`` (epoch seconds),
+and a separate consumer task moves them back onto the main topic once they
+are due.  Partitions whose head message is not yet due are paused rather
+than slept on, so neither consumer loop ever blocks on a backoff timer.
+
+Events that exhaust ``MAX_PROVISION_ATTEMPTS`` go to the dead-letter topic.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
+from aiokafka.errors import KafkaError
+
+from app.tracing import inject_kafka_headers
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def compute_backoff(attempt: int) -> float:
+    """Return the delay (seconds) before retrying after ``attempt`` failures.
+
+    Exponential growth capped at ``RETRY_MAX_DELAY_SECONDS`` with "equal
+    jitter": half the window is fixed, half is random, so retries from a
+    burst of failures spread out without ever collapsing to zero.
+    """
+    window = min(
+        settings.RETRY_MAX_DELAY_SECONDS,
+        settings.RETRY_BASE_DELAY_SECONDS * (2 ** max(attempt - 1, 0)),
+    )
+    return window / 2 + random.uniform(0, window / 2)
+
+
+def _user_key(data: dict) -> bytes | None:
+    # Keep the backend's keying so a user's events stay on one partition
+    user_id = data.get("user_id")
+    return user_id.encode("utf-8") if user_id else None
+
+
+class RetryScheduler:
+    """Publishes failed events to the retry/DLQ topics and drains the retry topic."""
+
+    def __init__(self, producer: AIOKafkaProducer) -> None:
+        self._producer = producer
+        self._consumer: AIOKafkaConsumer | None = None
+        self._running = False
+
+    def should_retry(self, data: dict) -> bool:
+        """True if the event still has attempts left."""
+        return data.get("attempt", 1) < settings.MAX_PROVISION_ATTEMPTS
+
+    async def schedule_retry(self, data: dict, error: str) -> float:
+        """Publish ``data`` to the retry topic.  Returns the chosen delay."""
+        attempt = data.get("attempt", 1)
+        delay = compute_backoff(attempt)
+        message = {
+            **data,
+            "attempt": attempt + 1,
+            "retry_at": time.time() + delay,
+            "last_error": error,
+        }
+        await self._producer.send_and_wait(
+            settings.KAFKA_RETRY_TOPIC,
+            value=message,
+            key=_user_key(data),
+            headers=inject_kafka_headers(),
+        )
+        logger.info(
+            "Scheduled retry %d/%d for request %s in %.1fs",
+            attempt + 1,
+            settings.MAX_PROVISION_ATTEMPTS,
+            data.get("request_id"),
+            delay,
+        )
+        return delay
+
+    async def dead_letter(self, data: dict, error: str) -> None:
+        """Publish ``data`` to the dead-letter topic."""
+        message = {**data, "last_error": error}
+        message.pop("retry_at", None)
+        await self._producer.send_and_wait(
+            settings.KAFKA_DLQ_TOPIC, value=message, headers=inject_kafka_headers()
+        )
+        logger.warning(
+            "Request %s dead-lettered after %d attempts: %s",
+            data.get("request_id"),
+            data.get("attempt", 1),
+            error,
+        )
+
+    async def start(self) -> None:
+        """Start the retry-topic consumer (manual commits)."""
+        self._consumer = AIOKafkaConsumer(
+            settings.KAFKA_RETRY_TOPIC,
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            group_id=settings.KAFKA_RETRY_GROUP_ID,
+            value_deserializer=lambda m: json.loads(m.decode("utf-8")),
+            auto_offset_reset="earliest",
+            enable_auto_commit=False,
+        )
+        await self._consumer.start()
+        self._running = True
+        logger.info("Retry consumer started on '%s'", settings.KAFKA_RETRY_TOPIC)
+
+    async def stop(self) -> None:
+        """Stop the retry-topic consumer."""
+        self._running = False
+        if self._consumer:
+            await self._consumer.stop()
+            self._consumer = None
+            logger.info("Retry consumer stopped")
+
+    def _resume(self, tp: TopicPartition) -> None:
+        if self._running and self._consumer is not None:
+            self._consumer.resume(tp)
+
+    async def run(self) -> None:
+        """Move due retries back onto the main topic until stopped.
+
+        Kafka errors are logged and the loop carries on after a short pause;
+        anything not yet committed is simply read again.
+        """
+        while self._running:
+            try:
+                await self._move_due_retries()
+            except KafkaError as exc:
+                if not self._running:
+                    break
+                logger.error("Retry consumer error, resuming in 5s: %s", exc, exc_info=True)
+                await asyncio.sleep(5)
+
+    async def _move_due_retries(self) -> None:
+        loop = asyncio.get_running_loop()
+        batches = await self._consumer.getmany(timeout_ms=1000)
+
+        for tp, records in batches.items():
+            for record in records:
+                due_in = record.value.get("retry_at", 0) - time.time()
+                if due_in > 0:
+                    # Rewind to this record and park the partition until it
+                    # is due.  Records behind it may belong to other users or
+                    # earlier attempts and be due sooner, so head-of-line
+                    # waiting is bounded by RETRY_MAX_DELAY_SECONDS.
+                    self._consumer.seek(tp, record.offset)
+                    self._consumer.pause(tp)
+                    loop.call_later(due_in, self._resume, tp)
+                    break
+
+                # Forward headers untouched so the retry stays in its trace
+                await self._producer.send_and_wait(
+                    settings.KAFKA_TOPIC,
+                    value=record.value,
+                    key=record.key,
+                    headers=list(record.headers or ()),
+                )
+                await self._consumer.commit({tp: record.offset + 1})
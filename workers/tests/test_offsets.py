@@ -0,0 +1,75 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiokafka import TopicPartition
+
+from offsets import OffsetTracker, RevokeListener
+
+TP = TopicPartition("provision-requests", 0)
+OTHER = TopicPartition("provision-requests", 1)
+
+
+def test_commits_up_to_lowest_in_flight_offset():
+    tracker = OffsetTracker()
+    for offset in (10, 11, 12):
+        tracker.track(TP, offset)
+
+    tracker.done(TP, 12)
+    tracker.done(TP, 11)
+    assert tracker.committable() == {TP: 10}
+
+    tracker.done(TP, 10)
+    assert tracker.committable() == {TP: 13}
+
+
+def test_only_offsets_that_advanced_are_committable():
+    tracker = OffsetTracker()
+    tracker.track(TP, 5)
+    tracker.done(TP, 5)
+    tracker.mark_committed(tracker.committable())
+
+    assert tracker.committable() == {}
+
+
+def test_forget_drops_revoked_partition():
+    tracker = OffsetTracker()
+    tracker.track(TP, 1)
+    tracker.track(OTHER, 7)
+    tracker.done(OTHER, 7)
+
+    tracker.forget(TP)
+    assert tracker.committable() == {OTHER: 8}
+
+    # A late done() for the revoked partition must not bring it back
+    tracker.done(TP, 1)
+    assert tracker.committable() == {OTHER: 8}
+
+
+def test_reassigned_partition_starts_fresh():
+    tracker = OffsetTracker()
+    tracker.track(TP, 3)
+    tracker.done(TP, 3)
+    tracker.mark_committed(tracker.committable())
+    tracker.forget(TP)
+
+    tracker.track(TP, 2)  # redelivered from an older committed offset
+    tracker.done(TP, 2)
+    assert tracker.committable() == {TP: 3}
+
+
+def test_revoke_listener_commits_then_forgets():
+    tracker = OffsetTracker()
+    tracker.track(TP, 4)
+    tracker.done(TP, 4)
+    commits = []
+
+    async def commit():
+        commits.append(tracker.committable())
+
+    asyncio.run(RevokeListener(tracker, commit).on_partitions_revoked({TP}))
+
+    assert commits == [{TP: 5}]
+    assert tracker.committable() == {}